@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 import json
 import os
@@ -5,17 +6,39 @@ from collections import Counter
 import re
 from datetime import datetime
 import argparse
+from csv_cache import load_csv
+
+# Common stop words excluded from keyword analysis
+STOP_WORDS = frozenset({'the', 'and', 'for', 'are', 'but', 'not', 'you', 'all', 'can', 'had', 'her', 'was', 'one', 'our', 'out', 'day', 'get', 'has', 'him', 'his', 'how', 'man', 'new', 'now', 'old', 'see', 'two', 'way', 'who', 'boy', 'did', 'its', 'let', 'put', 'say', 'she', 'too', 'use'})
+# Applied to lowercased text, so only the lowercase class is needed
+WORD_PATTERN = re.compile(r'\b[a-z]{4,}\b')
+
+# Rows per chunk when counting keywords straight from the CSV
+KEYWORD_CHUNK_SIZE = 50_000
+
+# Columns used by the analysis (the rest stay on disk)
+CSV_COLUMNS = ['title', 'short_desc', 'long_desc', 'image_url', 'anchor_link', 'timestamp', 'word_count']
+
+def count_keywords(text):
+    """Count non-stop-word keywords in a Series of text, in order of first appearance"""
+    # One regex scan over the joined text instead of one findall (and list) per row
+    words = pd.Series(WORD_PATTERN.findall('\n'.join(text).lower()), dtype=object)
+    words = words[~words.isin(STOP_WORDS)]
+    return words.value_counts(sort=False)
 
 class NewsAnalyzer:
     def __init__(self, csv_path="assets/csv/ainews.csv", json_path="assets/json/ainews.json"):
         self.csv_path = csv_path
         self.json_path = json_path
         self.df = None
+        # Full keyword ranking, computed once per loaded DataFrame
+        self._keyword_counts = None
         
     def load_data(self):
         """Load data from CSV file"""
         if os.path.exists(self.csv_path):
-            self.df = pd.read_csv(self.csv_path)
+            self.df = load_csv(self.csv_path, CSV_COLUMNS)
+            self._keyword_counts = None
             print(f"Loaded {len(self.df)} articles from {self.csv_path}")
             return True
         else:
@@ -28,44 +51,54 @@ class NewsAnalyzer:
             print("No data loaded. Please run load_data() first.")
             return
         
+        # One pass over the text columns and one over word_count
+        counts = self.df[['title', 'short_desc', 'long_desc', 'image_url']].notna().sum()
+        
         print("\n=== BASIC STATISTICS ===")
         print(f"Total articles: {len(self.df)}")
-        print(f"Articles with titles: {self.df['title'].notna().sum()}")
-        print(f"Articles with descriptions: {self.df['short_desc'].notna().sum()}")
-        print(f"Articles with full content: {self.df['long_desc'].notna().sum()}")
-        print(f"Articles with images: {self.df['image_url'].notna().sum()}")
+        print(f"Articles with titles: {counts['title']}")
+        print(f"Articles with descriptions: {counts['short_desc']}")
+        print(f"Articles with full content: {counts['long_desc']}")
+        print(f"Articles with images: {counts['image_url']}")
         
         if 'word_count' in self.df.columns:
-            print(f"Average word count: {self.df['word_count'].mean():.1f}")
-            print(f"Max word count: {self.df['word_count'].max()}")
-            print(f"Min word count: {self.df['word_count'].min()}")
+            word_stats = self.df['word_count'].agg(['mean', 'max', 'min'])
+            print(f"Average word count: {word_stats['mean']:.1f}")
+            print(f"Max word count: {word_stats['max']:.0f}")
+            print(f"Min word count: {word_stats['min']:.0f}")
     
     def analyze_keywords(self, top_n=20):
         """Analyze most common keywords in titles and descriptions"""
         if self.df is None:
             return
         
-        # Combine titles and descriptions
-        text_data = []
-        for _, row in self.df.iterrows():
-            if pd.notna(row['title']):
-                text_data.append(row['title'])
-            if pd.notna(row['short_desc']):
-                text_data.append(row['short_desc'])
-        
-        # Extract words (simple approach)
-        all_words = []
-        for text in text_data:
-            # Simple word extraction (remove common stop words)
-            words = re.findall(r'\b[a-zA-Z]{3,}\b', text.lower())
-            # Filter out common stop words
-            stop_words = {'the', 'and', 'for', 'are', 'but', 'not', 'you', 'all', 'can', 'had', 'her', 'was', 'one', 'our', 'out', 'day', 'get', 'has', 'him', 'his', 'how', 'man', 'new', 'now', 'old', 'see', 'two', 'way', 'who', 'boy', 'did', 'its', 'let', 'put', 'say', 'she', 'too', 'use'}
-            words = [word for word in words if word not in stop_words and len(word) > 3]
-            all_words.extend(words)
-        
-        # Count words
-        word_counts = Counter(all_words)
-        most_common = word_counts.most_common(top_n)
+        if self._keyword_counts is None:
+            # Combine titles and descriptions into a single column of text
+            text = self.df[['title', 'short_desc']].stack().dropna()
+            # Count words (stable sort keeps ties in order of first appearance)
+            self._keyword_counts = count_keywords(text).sort_values(ascending=False, kind='stable')
+        
+        most_common = list(self._keyword_counts.head(top_n).items())
+        
+        print(f"\n=== TOP {top_n} KEYWORDS ===")
+        for word, count in most_common:
+            print(f"{word}: {count}")
+        
+        return most_common
+    
+    def analyze_keywords_streaming(self, top_n=20):
+        """Analyze keywords straight from the CSV in chunks (no load_data() needed), keeping memory use flat"""
+        counter = Counter()
+        for chunk in pd.read_csv(
+            self.csv_path,
+            usecols=['title', 'short_desc'],
+            dtype={'title': 'string', 'short_desc': 'string'},
+            chunksize=KEYWORD_CHUNK_SIZE
+        ):
+            counter.update(count_keywords(chunk.stack().dropna()).to_dict())
+        
+        # most_common sorts stably, so ties keep their order of first appearance
+        most_common = counter.most_common(top_n)
         
         print(f"\n=== TOP {top_n} KEYWORDS ===")
         for word, count in most_common:
@@ -78,9 +111,12 @@ class NewsAnalyzer:
         if self.df is None or 'timestamp' not in self.df.columns:
             return
         
-        # Convert timestamp to datetime
-        self.df['timestamp'] = pd.to_datetime(self.df['timestamp'])
-        self.df['date'] = self.df['timestamp'].dt.date
+        # Timestamps are normally parsed on load; only convert if that failed
+        if not pd.api.types.is_datetime64_any_dtype(self.df['timestamp']):
+            self.df['timestamp'] = pd.to_datetime(self.df['timestamp'])
+            self.df['date'] = self.df['timestamp'].dt.date
+        elif 'date' not in self.df.columns:
+            self.df['date'] = self.df['timestamp'].dt.date
         
         # Count articles per day
         daily_counts = self.df['date'].value_counts().sort_index()
@@ -92,6 +128,12 @@ class NewsAnalyzer:
         
         return daily_counts
     
+    def newest_first(self):
+        """Articles sorted newest first (the scraper appends new rows to the end of the CSV)"""
+        if 'timestamp' not in self.df.columns:
+            return self.df
+        return self.df.sort_values('timestamp', ascending=False, kind='stable', na_position='last')
+    
     def export_report(self, output_file="analysis_report.txt"):
         """Export analysis report to file"""
         if self.df is None:
@@ -105,9 +147,10 @@ class NewsAnalyzer:
             # Basic stats
             f.write("BASIC STATISTICS:\n")
             f.write(f"Total articles: {len(self.df)}\n")
-            f.write(f"Articles with titles: {self.df['title'].notna().sum()}\n")
-            f.write(f"Articles with descriptions: {self.df['short_desc'].notna().sum()}\n")
-            f.write(f"Articles with full content: {self.df['long_desc'].notna().sum()}\n")
+            counts = self.df[['title', 'short_desc', 'long_desc']].notna().sum()
+            f.write(f"Articles with titles: {counts['title']}\n")
+            f.write(f"Articles with descriptions: {counts['short_desc']}\n")
+            f.write(f"Articles with full content: {counts['long_desc']}\n")
             
             if 'word_count' in self.df.columns:
                 f.write(f"Average word count: {self.df['word_count'].mean():.1f}\n")
@@ -118,7 +161,7 @@ class NewsAnalyzer:
                 f.write(f"- {word}: {count}\n")
             
             f.write("\nSAMPLE TITLES:\n")
-            for i, title in enumerate(self.df['title'].dropna().head(5), 1):
+            for i, title in enumerate(self.newest_first()['title'].dropna().head(5), 1):
                 f.write(f"{i}. {title}\n")
         
         print(f"Analysis report exported to: {output_file}")
@@ -129,30 +172,35 @@ class NewsAnalyzer:
             return
         
         print(f"\n=== SAMPLE ARTICLES (First {n}) ===")
-        for i, row in self.df.head(n).iterrows():
-            # Safely handle short_desc that might be NaN/float
-            short_desc = row.get('short_desc', 'No description')
-            if pd.isna(short_desc) or not isinstance(short_desc, str):
-                short_desc = 'No description'
-            else:
-                short_desc = short_desc[:100] + "..." if len(short_desc) > 100 else short_desc
-            
-            print(f"\n{i+1}. {row.get('title', 'No title')}")
+        sample = self.newest_first().head(n)
+        
+        # Truncate descriptions in one pass (short_desc might be missing)
+        if 'short_desc' in sample.columns:
+            descriptions = sample['short_desc'].fillna('No description')
+            descriptions = np.where(descriptions.str.len() > 100, descriptions.str.slice(0, 100) + "...", descriptions)
+        else:
+            descriptions = ['No description'] * len(sample)
+        
+        for i, ((_, row), short_desc) in enumerate(zip(sample.iterrows(), descriptions), 1):
+            print(f"\n{i}. {row.get('title', 'No title')}")
             print(f"   Description: {short_desc}")
             print(f"   Timestamp: {row.get('timestamp', 'No timestamp')}")
             print(f"   Link: {row.get('anchor_link', 'No link')}")
 
 def get_latest_multisite_csv():
     csv_dir = os.path.join('assets', 'csv')
-    files = [f for f in os.listdir(csv_dir) if f.startswith('ai_ml_multisite_') and f.endswith('.csv')]
+    # Pick the most recently modified file; DirEntry caches its stat() result
+    with os.scandir(csv_dir) as entries:
+        files = [e for e in entries if e.name.startswith('ai_ml_multisite_') and e.name.endswith('.csv')]
     if not files:
         return None
-    files.sort(reverse=True)
-    return os.path.join(csv_dir, files[0])
+    return max(files, key=lambda e: e.stat().st_mtime).path
 
 def main():
     parser = argparse.ArgumentParser(description='Analyze AI/ML news data')
     parser.add_argument('--multi', action='store_true', help='Analyze multi-site data')
+    parser.add_argument('--keywords-only', action='store_true',
+                        help='Only count keywords, streaming the CSV in chunks (for files too large to load)')
     args = parser.parse_args()
 
     if args.multi:
@@ -164,6 +212,14 @@ def main():
     else:
         analyzer = NewsAnalyzer()
 
+    if args.keywords_only:
+        if os.path.exists(analyzer.csv_path):
+            analyzer.analyze_keywords_streaming()
+        else:
+            print(f"CSV file not found: {analyzer.csv_path}")
+            print('Please run the scraper first to generate data.')
+        return
+
     if analyzer.load_data():
         analyzer.basic_stats()
         analyzer.analyze_keywords()
@@ -0,0 +1,54 @@
+import pandas as pd
+import pyarrow.parquet as pq
+import logging
+import os
+import threading
+
+# Dtypes for every text column the scraper writes. The Parquet sidecar is always
+# built from the full CSV with these dtypes, so its schema does not depend on
+# which program (analyzer or dashboard) happened to build it
+CSV_DTYPES = {
+    'title': 'string',
+    'short_desc': 'string',
+    'long_desc': 'string',
+    'image_url': 'string',
+    'anchor_link': 'string',
+    'source': 'string',
+    'domain': 'string',
+    'scraped_at': 'string',
+    'word_count': 'Int32'
+}
+
+def load_csv(csv_path, columns):
+    """Load the given columns of a scraped CSV, using its Parquet sidecar when it is current.
+
+    Columns missing from the data are skipped. A stale or missing sidecar is rebuilt
+    from the whole CSV, so the (large) article bodies are only parsed when the CSV changes.
+    """
+    pq_path = os.path.splitext(csv_path)[0] + '.parquet'
+    # The sidecar is stamped with the mtime of the CSV it was built from
+    csv_mtime = os.stat(csv_path).st_mtime_ns
+    if os.path.exists(pq_path) and os.stat(pq_path).st_mtime_ns == csv_mtime:
+        available = pq.read_schema(pq_path).names
+        return pd.read_parquet(pq_path, columns=[col for col in columns if col in available])
+
+    # The sidecar keeps every column so every reader can share it
+    df = pd.read_csv(csv_path, dtype=CSV_DTYPES, engine='c')
+    # Parsed after reading, since parse_dates fails on files without the column
+    if 'timestamp' in df.columns:
+        try:
+            df['timestamp'] = pd.to_datetime(df['timestamp'], format='ISO8601', errors='coerce')
+        except ValueError:
+            # Mixed UTC offsets: leave the strings as they are, as parse_dates did
+            pass
+    # Write to a temporary file and rename so concurrent readers never see a partial file
+    tmp_path = f"{pq_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        df.to_parquet(tmp_path, compression='zstd', index=False)
+        os.utime(tmp_path, ns=(csv_mtime, csv_mtime))
+        os.replace(tmp_path, pq_path)
+    except Exception as e:
+        logging.getLogger(__name__).warning(f"Could not write Parquet cache {pq_path}: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return df[[col for col in columns if col in df.columns]]
@@ -1,39 +1,102 @@
-from flask import Flask, render_template_string, jsonify, request
+from flask import Flask, jsonify, request
+from flask.json.provider import DefaultJSONProvider
+import orjson
+import numpy as np
 import pandas as pd
 import json
 import os
 from datetime import datetime
+from functools import lru_cache
+from csv_cache import load_csv
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider that serializes with orjson"""
+    
+    def dumps(self, obj, **kwargs):
+        option = orjson.OPT_NAIVE_UTC | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        if kwargs.get('sort_keys', self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get('indent'):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
 
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
+
+# Columns rendered by the dashboard; long_desc is never displayed, so the (large)
+# article bodies are never kept in memory. They are only parsed when the shared
+# Parquet sidecar is rebuilt after the CSV changes
+CSV_COLUMNS = ['title', 'short_desc', 'image_url', 'anchor_link', 'timestamp', 'word_count']
+
+@lru_cache(maxsize=4)
+def _load_df(csv_path, mtime):
+    """Parse a CSV file once per modification time"""
+    df = load_csv(csv_path, CSV_COLUMNS)
+    if 'word_count' in df.columns:
+        df['word_count'] = df['word_count'].fillna(0)
+    # Dictionary-encode URL columns when values repeat (e.g. placeholder images)
+    for col in ('image_url', 'anchor_link'):
+        if col in df.columns and df[col].nunique() <= len(df) // 2:
+            df[col] = df[col].astype('category')
+    # Convert timestamp to readable format
+    if 'timestamp' in df.columns:
+        # read_csv leaves the column unparsed if any value is malformed
+        if not pd.api.types.is_datetime64_any_dtype(df['timestamp']):
+            df['timestamp'] = pd.to_datetime(df['timestamp'], errors='coerce')
+        df['formatted_date'] = df['timestamp'].dt.strftime('%Y-%m-%d %H:%M')
+        # RFC 3339 strings for the API, formatted here once per file rather than per request
+        df['iso_timestamp'] = df['timestamp'].map(lambda t: t.isoformat() if pd.notna(t) else '')
+    return df
+
+@lru_cache(maxsize=1)
+def _latest_multisite_csv(csv_dir, dir_mtime):
+    """Find the newest multi-site CSV; cached per directory modification time"""
+    # Pick the most recently modified file; DirEntry caches its stat() result
+    with os.scandir(csv_dir) as entries:
+        files = [e for e in entries if e.name.startswith('ai_ml_multisite_') and e.name.endswith('.csv')]
+    if not files:
+        return None
+    return max(files, key=lambda e: e.stat().st_mtime).path
+
+def _text_column(df, column, default):
+    """Return a text column with missing values replaced by a default"""
+    if column in df.columns:
+        values = df[column]
+        if isinstance(values.dtype, pd.CategoricalDtype) and default not in values.cat.categories:
+            values = values.cat.add_categories([default])
+        return values.fillna(default)
+    return pd.Series(default, index=df.index, dtype='string')
 
 class DataViewer:
     def __init__(self, csv_path="assets/csv/ainews.csv", json_path="assets/json/ainews.json"):
-        self.csv_path = csv_path
+        self.csv_path = self.resolve_csv_path(csv_path)
         self.json_path = json_path
-        # Fallback to sample data if main data doesn't exist
-        if not os.path.exists(self.csv_path):
+    
+    @staticmethod
+    def resolve_csv_path(csv_path="assets/csv/ainews.csv"):
+        """Return the CSV path, falling back to sample data if it doesn't exist yet"""
+        if not os.path.exists(csv_path):
             sample_path = "assets/csv/sample_data.csv"
             if os.path.exists(sample_path):
-                self.csv_path = sample_path
+                return sample_path
+        return csv_path
     
     @staticmethod
     def get_latest_multisite_csv():
         csv_dir = os.path.join('assets', 'csv')
-        files = [f for f in os.listdir(csv_dir) if f.startswith('ai_ml_multisite_') and f.endswith('.csv')]
-        if not files:
-            return None
-        files.sort(reverse=True)
-        return os.path.join(csv_dir, files[0])
+        # Only rescan when files have been added, removed or renamed
+        return _latest_multisite_csv(csv_dir, os.stat(csv_dir).st_mtime_ns)
 
     def get_data(self):
         """Load and return data"""
         if os.path.exists(self.csv_path):
-            df = pd.read_csv(self.csv_path)
-            # Convert timestamp to readable format
-            if 'timestamp' in df.columns:
-                df['timestamp'] = pd.to_datetime(df['timestamp'])
-                df['formatted_date'] = df['timestamp'].dt.strftime('%Y-%m-%d %H:%M')
-            return df
+            # The cache is keyed on mtime, so a rewritten CSV is re-parsed
+            mtime = os.path.getmtime(self.csv_path)
+            # Shallow copy so callers can't mutate the cached frame
+            return _load_df(self.csv_path, mtime).copy(deep=False)
         return pd.DataFrame()
     
     def get_stats(self):
@@ -42,66 +105,63 @@ class DataViewer:
         if df.empty:
             return {}
         
+        if 'timestamp' in df.columns:
+            earliest, latest = df['timestamp'].agg(['min', 'max'])
+            date_range = {'earliest': earliest.strftime('%Y-%m-%d'), 'latest': latest.strftime('%Y-%m-%d')}
+        else:
+            date_range = {'earliest': 'N/A', 'latest': 'N/A'}
+        
         stats = {
             'total_articles': len(df),
-            'articles_with_content': len(df[df['long_desc'].notna()]) if 'long_desc' in df.columns else 0,
+            # long_desc is not loaded; word_count is non-zero exactly when it was present
+            'articles_with_content': int((df['word_count'] > 0).sum()) if 'word_count' in df.columns else 0,
             'last_updated': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-            'date_range': {
-                'earliest': df['timestamp'].min().strftime('%Y-%m-%d') if 'timestamp' in df.columns else 'N/A',
-                'latest': df['timestamp'].max().strftime('%Y-%m-%d') if 'timestamp' in df.columns else 'N/A'
-            }
+            'date_range': date_range
         }
         return stats
 
 viewer = DataViewer()
 
+@lru_cache(maxsize=8)
+def _cached_viewer(csv_path):
+    """Return a shared DataViewer for an already resolved CSV path"""
+    return DataViewer(csv_path=csv_path)
+
+def _get_viewer(csv_path=None):
+    """Return a shared DataViewer for a CSV path (None for the default data)"""
+    # The sample-data fallback is resolved per request, so the real CSV is used as soon as it exists
+    resolved = DataViewer.resolve_csv_path(csv_path) if csv_path else DataViewer.resolve_csv_path()
+    return _cached_viewer(resolved)
+
 @app.route('/')
 def index():
     """Main dashboard page"""
     use_multi = request.args.get('multi', '0') == '1'
-    if use_multi:
-        multi_csv = DataViewer.get_latest_multisite_csv()
-        viewer = DataViewer(csv_path=multi_csv) if multi_csv else DataViewer()
-    else:
-        viewer = DataViewer()
+    csv_path = DataViewer.get_latest_multisite_csv() if use_multi else None
+    viewer = _get_viewer(csv_path)
     df = viewer.get_data()
     stats = viewer.get_stats()
     
     # Get recent articles (top 10)
     recent_articles = []
     if not df.empty:
-        if 'timestamp' in df.columns:
-            df_sorted = df.sort_values('timestamp', ascending=False)
-        else:
-            df_sorted = df
+        # Partial selection instead of sorting the whole frame
+        df_top = df.nlargest(10, 'timestamp') if 'timestamp' in df.columns else df.head(10)
+        # Truncate descriptions for display
+        short_desc = _text_column(df_top, 'short_desc', 'No description')
+        short_desc = np.where(short_desc.str.len() > 200, short_desc.str.slice(0, 200) + "...", short_desc)
         
-        for _, row in df_sorted.head(10).iterrows():
-            # Safely handle short_desc that might be NaN/float
-            short_desc = row.get('short_desc', 'No description')
-            if pd.isna(short_desc) or not isinstance(short_desc, str):
-                short_desc = 'No description'
-            else:
-                # Truncate for display
-                short_desc = short_desc[:200] + "..." if len(short_desc) > 200 else short_desc
-            
-            # Safely handle title that might be NaN/float
-            title = row.get('title', 'No title')
-            if pd.isna(title) or not isinstance(title, str):
-                title = 'No title'
-            
-            article = {
-                'title': title,
-                'short_desc': short_desc,
-                'timestamp': row.get('formatted_date', 'No date'),
-                'anchor_link': row.get('anchor_link', '#'),
-                'word_count': row.get('word_count', 0)
-            }
-            recent_articles.append(article)
+        recent_articles = pd.DataFrame({
+            'title': _text_column(df_top, 'title', 'No title'),
+            'short_desc': short_desc,
+            'timestamp': _text_column(df_top, 'formatted_date', 'No date'),
+            'anchor_link': _text_column(df_top, 'anchor_link', '#'),
+            'word_count': df_top['word_count'] if 'word_count' in df_top.columns else 0
+        }).to_dict('records')
     
-    return render_template_string(HTML_TEMPLATE, 
-                                articles=recent_articles, 
-                                stats=stats,
-                                use_multi=use_multi)
+    return DASHBOARD_TEMPLATE.render(articles=recent_articles, 
+                                     stats=stats,
+                                     use_multi=use_multi)
 
 @app.route('/api/articles')
 def api_articles():
@@ -111,34 +171,14 @@ def api_articles():
         return jsonify([])
     
     # Convert to JSON format
-    articles = []
-    for _, row in df.iterrows():
-        # Safely handle potential NaN/float values
-        title = row.get('title', '')
-        if pd.isna(title) or not isinstance(title, str):
-            title = ''
-        
-        short_desc = row.get('short_desc', '')
-        if pd.isna(short_desc) or not isinstance(short_desc, str):
-            short_desc = ''
-        
-        anchor_link = row.get('anchor_link', '')
-        if pd.isna(anchor_link) or not isinstance(anchor_link, str):
-            anchor_link = ''
-        
-        image_url = row.get('image_url', '')
-        if pd.isna(image_url) or not isinstance(image_url, str):
-            image_url = ''
-        
-        article = {
-            'title': title,
-            'short_desc': short_desc,
-            'timestamp': row.get('timestamp', '').isoformat() if pd.notna(row.get('timestamp', '')) else '',
-            'anchor_link': anchor_link,
-            'word_count': row.get('word_count', 0),
-            'image_url': image_url
-        }
-        articles.append(article)
+    articles = pd.DataFrame({
+        'title': _text_column(df, 'title', ''),
+        'short_desc': _text_column(df, 'short_desc', ''),
+        'timestamp': _text_column(df, 'iso_timestamp', ''),
+        'anchor_link': _text_column(df, 'anchor_link', ''),
+        'word_count': df['word_count'] if 'word_count' in df.columns else 0,
+        'image_url': _text_column(df, 'image_url', '')
+    }).to_dict('records')
     
     return jsonify(articles)
 
@@ -292,9 +332,16 @@ HTML_TEMPLATE = '''
 </html>
 '''
 
+# Compile the template once instead of re-parsing it on every request
+DASHBOARD_TEMPLATE = app.jinja_env.from_string(HTML_TEMPLATE)
+
 if __name__ == '__main__':
-    import os
     port = int(os.environ.get('PORT', 5000))
     print("Starting AI News Dashboard...")
     print(f"Open http://localhost:{port} in your browser")
-    app.run(debug=False, host='0.0.0.0', port=port)
+    if os.environ.get('FLASK_DEV'):
+        # Single-threaded Werkzeug server with the debugger, for local development
+        app.run(debug=True, host='0.0.0.0', port=port)
+    else:
+        from waitress import serve
+        serve(app, host='0.0.0.0', port=port, threads=8)
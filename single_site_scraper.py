@@ -1,14 +1,26 @@
-import requests
-from bs4 import BeautifulSoup
+import asyncio
+import httpx
+import lxml.html
+from lxml import etree
 import os
-import pandas as pd
+import csv
 import json
+import orjson
+import random
+import re
 import time
 import logging
 from datetime import datetime
+from functools import lru_cache
 from urllib.parse import urljoin, urlparse
 import argparse
 
+# Article pages are streamed into the parser in chunks of this many bytes
+ARTICLE_CHUNK_SIZE = 16384
+
+# Collapses the whitespace runs left between joined text nodes
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -18,22 +30,85 @@ logging.basicConfig(
         logging.StreamHandler()
     ]
 )
+# httpx logs every request at INFO level; our own messages already cover failures
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+@lru_cache(maxsize=8)
+def _load_config_cached(config_file, mtime):
+    """Parse a config file once per modification time (callers must not mutate the result)"""
+    with open(config_file, 'rb') as f:
+        return orjson.loads(f.read())
+
+@lru_cache(maxsize=32)
+def _parser_supports_encoding(encoding):
+    """Whether lxml's parser accepts an encoding name (its codecs differ from Python's)"""
+    try:
+        etree.HTMLParser(encoding=encoding)
+    except LookupError:
+        return False
+    return True
+
+def response_encoding(response, head):
+    """Encoding for parsing a response body (starting with the bytes in head): the
+    Content-Type charset, else the document's own <meta> declaration, else UTF-8 (as httpx assumes)"""
+    charset = response.charset_encoding
+    if charset:
+        if _parser_supports_encoding(charset):
+            return charset
+        # An unknown charset (e.g. "utf8mb4") would make the parser raise LookupError
+        logging.warning(f"Unsupported charset {charset!r} for {response.url}; detecting the encoding instead")
+    if b"charset" in head[:1024].lower():
+        return None
+    return "utf-8"
 
 class AINewsScraper:
+    # XPath expressions are compiled once and evaluated in C by lxml
+    GRID_XPATH = etree.XPath('//div[@class="grid grid-cols-1 gap-6 md:grid-cols-2 lg:grid-cols-3"]')
+    ARTICLE_XPATH = etree.XPath('.//div[@class="transparent h-full cursor-pointer overflow-hidden rounded-lg flex flex-col border"]')
+    TITLE_XPATH = etree.XPath("(.//h2)[1]")
+    DESC_XPATH = etree.XPath("(.//p)[1]")
+    IMAGE_XPATH = etree.XPath('(.//img[@class="absolute inset-0 h-full w-full object-cover"])[1]/@src', smart_strings=False)
+    TIME_XPATH = etree.XPath("(.//time)[1]/@datetime", smart_strings=False)
+    SCRIPT_STYLE_XPATH = etree.XPath(".//script | .//style")
+    LINK_XPATH = etree.XPath("((.//div[contains(concat(' ', normalize-space(@class), ' '), ' space-y-3 ')])[1]//a[@href])[1]/@href", smart_strings=False)
+    
     def __init__(self, config_file="config.json"):
         self.config = self.load_config(config_file)
+        # Parse the base URL once; every scraped article shares it
+        self._base_url = self.config['base_url']
+        base = urlparse(self._base_url)
+        self._scheme = base.scheme
+        self._domain = base.netloc
+        self._origin = f"{base.scheme}://{base.netloc}"
+        
+        # Output paths, with their directories created up front
+        self._csv_path = self.config['csv_path']
+        self._json_path = self.config['json_path']
+        for output_dir in {os.path.dirname(self._csv_path), os.path.dirname(self._json_path)}:
+            if output_dir:
+                os.makedirs(output_dir, exist_ok=True)
+        
         self.headers = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
             "Accept-Language": "en-US,en;q=0.9",
             "Referer": "https://www.google.com/",
             "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
-            "Accept-Encoding": "gzip, deflate, br",
             "DNT": "1",
-            "Connection": "keep-alive",
             "Upgrade-Insecure-Requests": "1"
         }
-        self.session = requests.Session()
-        self.session.headers.update(self.headers)
+        # Accept-Encoding is left to httpx, which only advertises what it can decode
+        # (br comes from the brotli package). HTTP/2 lets concurrent article fetches
+        # share one multiplexed connection
+        self.session = httpx.AsyncClient(
+            http2=True,
+            headers=self.headers,
+            timeout=self.config['timeout'],
+            follow_redirects=True,
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=40)
+        )
+        # Rate limiting and a cap on concurrent article fetches
+        self._next_request_at = 0.0
+        self._fetch_semaphore = asyncio.Semaphore(self.config['max_workers'])
         
     def load_config(self, config_file):
         """Load configuration from JSON file"""
@@ -44,13 +119,13 @@ class AINewsScraper:
             "delay_between_requests": 1,
             "max_retries": 3,
             "timeout": 10,
-            "fetch_full_content": True
+            "fetch_full_content": True,
+            "max_workers": 8
         }
         
         if os.path.exists(config_file):
             try:
-                with open(config_file, 'r') as f:
-                    user_config = json.load(f)
+                user_config = _load_config_cached(config_file, os.stat(config_file).st_mtime_ns)
                 default_config.update(user_config)
                 logging.info(f"Loaded configuration from {config_file}")
             except Exception as e:
@@ -63,132 +138,198 @@ class AINewsScraper:
         
         return default_config
     
-    def make_request(self, url, retries=0):
-        """Make HTTP request with retry logic"""
-        try:
-            response = self.session.get(url, timeout=self.config['timeout'])
-            response.raise_for_status()
-            return response
-        except requests.RequestException as e:
-            if retries < self.config['max_retries']:
-                logging.warning(f"Request failed for {url}. Retrying in 2 seconds... (Attempt {retries + 1})")
-                time.sleep(2)
-                return self.make_request(url, retries + 1)
-            else:
-                logging.error(f"Failed to fetch {url} after {self.config['max_retries']} retries: {e}")
-                return None
+    async def wait_for_request_slot(self):
+        """Wait until the next request may start, spacing requests by the configured delay"""
+        # No await between reading and reserving the slot, so this is atomic on the event loop
+        now = time.monotonic()
+        wait = self._next_request_at - now
+        self._next_request_at = max(now, self._next_request_at) + self.config['delay_between_requests']
+        if wait > 0:
+            await asyncio.sleep(wait)
     
-    def extract_article_content(self, url):
-        """Extract full article content from article URL"""
-        if not self.config['fetch_full_content']:
-            return None
+    async def make_request(self, url, consume=None):
+        """Make HTTP request with retry logic (exponential backoff with jitter).
+        
+        With consume, the body is streamed instead of read into memory and the result
+        of await consume(response) is returned; errors while streaming are retried too.
+        """
+        max_retries = self.config['max_retries']
+        for attempt in range(max_retries + 1):
+            await self.wait_for_request_slot()
+            try:
+                if consume is None:
+                    response = await self.session.get(url)
+                    response.raise_for_status()
+                    return response
+                async with self.session.stream("GET", url) as response:
+                    response.raise_for_status()
+                    return await consume(response)
+            except httpx.HTTPStatusError as e:
+                # Client errors such as 404 won't go away on retry (timeouts and rate limits might)
+                status = e.response.status_code
+                if 400 <= status < 500 and status not in (408, 429):
+                    logging.error(f"Failed to fetch {url}: {e}")
+                    return None
+                error = e
+            except httpx.HTTPError as e:
+                error = e
             
-        response = self.make_request(url)
-        if not response:
-            return None
+            if attempt < max_retries:
+                delay = 2 ** (attempt + 1) + random.random()
+                logging.warning(f"Request failed for {url}. Retrying in {delay:.1f} seconds... (Attempt {attempt + 1})")
+                await asyncio.sleep(delay)
+        
+        logging.error(f"Failed to fetch {url} after {max_retries} retries: {error}")
+        return None
+    
+    async def fetch_article_content(self, article):
+        """Fetch an article's full content; returns the article with its content (None on failure)"""
+        # One bad page must not abort the scrape, so every error is contained here
+        try:
+            async with self._fetch_semaphore:
+                long_desc = await self.make_request(article["anchor_link"], consume=self.read_article_content)
+        except Exception as e:
+            logging.error(f"Error fetching content from {article['anchor_link']}: {e}")
+            long_desc = None
+        return article, long_desc
+    
+    async def read_article_content(self, response):
+        """Feed a streamed article page to an incremental parser, stopping at the end of the content div"""
+        parser = None
+        try:
+            async for chunk in response.aiter_bytes(ARTICLE_CHUNK_SIZE):
+                if parser is None:
+                    # Only div end events are reported; the rest of the page is still parsed
+                    parser = etree.HTMLPullParser(events=("end",), tag="div", encoding=response_encoding(response, chunk))
+                    parser.set_element_class_lookup(lxml.html.HtmlElementClassLookup())
+                parser.feed(chunk)
+                for _, div in parser.read_events():
+                    if div.get("id") == "content-blocks":
+                        # The rest of the page is never downloaded
+                        return self.extract_article_content(div, response.url)
             
+            if parser is not None:
+                # The div may only be closed when the document ends
+                parser.close()
+                for _, div in parser.read_events():
+                    if div.get("id") == "content-blocks":
+                        return self.extract_article_content(div, response.url)
+        except httpx.HTTPError:
+            # Network errors while streaming are retried by make_request
+            raise
+        except Exception as e:
+            logging.error(f"Error parsing {response.url}: {e}")
+        
+        return None
+    
+    def extract_article_content(self, content_div, url):
+        """Extract full article text from the article's content div"""
         try:
-            soup = BeautifulSoup(response.text, "html.parser")
-            content_div = soup.find("div", id="content-blocks")
-            if content_div:
-                # Remove script and style elements
-                for script in content_div(["script", "style"]):
-                    script.decompose()
-                return content_div.get_text(separator=" ", strip=True)
+            # Remove script and style elements (drop_tree keeps the text that follows them)
+            for script in self.SCRIPT_STYLE_XPATH(content_div):
+                script.drop_tree()
+            return WHITESPACE_PATTERN.sub(" ", " ".join(content_div.itertext())).strip()
         except Exception as e:
             logging.error(f"Error extracting content from {url}: {e}")
         
         return None
     
-    def scrape_news(self):
+    async def scrape_news(self):
         """Main scraping function"""
         logging.info(f"Starting scrape of {self.config['base_url']}")
         
-        response = self.make_request(self.config['base_url'])
+        response = await self.make_request(self.config['base_url'])
         if not response:
             logging.error("Failed to fetch main page")
             return []
         
-        soup = BeautifulSoup(response.text, "html.parser")
+        parser = lxml.html.HTMLParser(encoding=response_encoding(response, response.content))
+        tree = lxml.html.fromstring(response.content, parser=parser)
         logging.info(f"Status Code: {response.status_code}")
         
         results = []
-        grid_div = soup.find("div", class_="grid grid-cols-1 gap-6 md:grid-cols-2 lg:grid-cols-3")
+        grid_divs = self.GRID_XPATH(tree)
         
-        if not grid_div:
+        if not grid_divs:
             logging.warning("Could not find main content grid")
             return results
         
-        articles = grid_div.find_all("div", class_="transparent h-full cursor-pointer overflow-hidden rounded-lg flex flex-col border")
+        articles = self.ARTICLE_XPATH(grid_divs[0])
         logging.info(f"Found {len(articles)} articles")
         
+        # Extract article metadata from the listing (no network I/O); the whole batch
+        # shares one scrape time
+        scraped_at = datetime.now().isoformat()
         for i, div in enumerate(articles, 1):
             logging.info(f"Processing article {i}/{len(articles)}")
             
-            # Extract article data
-            article_data = self.extract_article_data(div)
+            article_data = self.extract_article_data(div, scraped_at)
             if article_data:
                 results.append(article_data)
-                
-            # Add delay between requests
-            if i < len(articles):
-                time.sleep(self.config['delay_between_requests'])
+        
+        # Fetch full article content concurrently; make_request keeps requests spaced out.
+        # Each page is parsed while it streams in and recorded as soon as it is done
+        if self.config['fetch_full_content']:
+            tasks = [asyncio.create_task(self.fetch_article_content(article)) for article in results if article["anchor_link"]]
+            for next_page in asyncio.as_completed(tasks):
+                article, long_desc = await next_page
+                article["long_desc"] = long_desc
+                article["word_count"] = len(long_desc.split()) if long_desc else 0
         
         logging.info(f"Successfully scraped {len(results)} articles")
         return results
     
-    def extract_article_data(self, div):
+    def absolute_url(self, url):
+        """Resolve a link from the listing page against the base URL"""
+        if url.startswith("http"):
+            return url
+        if url.startswith("//"):
+            return f"{self._scheme}:{url}"
+        if url.startswith("/"):
+            return self._origin + url
+        # Path-relative links are rare; leave them to the full RFC 3986 resolution
+        return urljoin(self._base_url, url)
+    
+    def extract_article_data(self, div, scraped_at):
         """Extract data from a single article div"""
         try:
             # Title
-            title_tag = div.find("h2")
-            title = title_tag.get_text(strip=True) if title_tag else None
+            title_tags = self.TITLE_XPATH(div)
+            title = title_tags[0].text_content().strip() if title_tags else None
             
             # Short description
-            desc_tag = div.find("p")
-            short_desc = desc_tag.get_text(strip=True) if desc_tag else None
+            desc_tags = self.DESC_XPATH(div)
+            short_desc = desc_tags[0].text_content().strip() if desc_tags else None
             
             # Image URL
-            img_tag = div.find("img", class_="absolute inset-0 h-full w-full object-cover")
-            image_url = img_tag.get("src") if img_tag else None
-            if image_url and not image_url.startswith("http"):
-                image_url = urljoin(self.config['base_url'], image_url)
+            image_urls = self.IMAGE_XPATH(div)
+            image_url = image_urls[0] if image_urls else None
+            if image_url:
+                image_url = self.absolute_url(image_url)
             
             # Timestamp
-            time_tag = div.find("time")
-            timestamp = time_tag.get("datetime") if time_tag else None
-            
-            # Anchor Link
-            anchor_link = None
-            spacey_div = div.find("div", class_="space-y-3")
-            if spacey_div:
-                anchor_tag = spacey_div.find("a", href=True)
-                if anchor_tag:
-                    anchor_link = anchor_tag["href"]
-                    if anchor_link and not anchor_link.startswith("http"):
-                        anchor_link = urljoin(self.config['base_url'], anchor_link)
+            timestamps = self.TIME_XPATH(div)
+            timestamp = timestamps[0] if timestamps else None
             
-            # Long description (full article content)
-            long_desc = None
+            # Anchor Link (first link inside the "space-y-3" text block)
+            anchor_links = self.LINK_XPATH(div)
+            anchor_link = anchor_links[0] if anchor_links else None
             if anchor_link:
-                long_desc = self.extract_article_content(anchor_link)
-            
-            # Additional metadata
-            word_count = len(long_desc.split()) if long_desc else 0
-            scraped_at = datetime.now().isoformat()
+                anchor_link = self.absolute_url(anchor_link)
             
+            # Additional metadata (long_desc and word_count are filled in by scrape_news)
             return {
                 "title": title,
                 "short_desc": short_desc,
                 "image_url": image_url,
                 "timestamp": timestamp,
-                "source": self.config['base_url'],
+                "source": self._base_url,
                 "published": False,
                 "anchor_link": anchor_link,
-                "long_desc": long_desc,
-                "word_count": word_count,
+                "long_desc": None,
+                "word_count": 0,
                 "scraped_at": scraped_at,
-                "domain": urlparse(self.config['base_url']).netloc
+                "domain": self._domain
             }
             
         except Exception as e:
@@ -201,36 +342,38 @@ class AINewsScraper:
             logging.warning("No data to save")
             return
         
-        # Create directories
-        csv_dir = os.path.dirname(self.config['csv_path'])
-        json_dir = os.path.dirname(self.config['json_path'])
-        os.makedirs(csv_dir, exist_ok=True)
-        os.makedirs(json_dir, exist_ok=True)
-        
         # Load existing data
-        existing_df = self.load_existing_data()
+        existing_rows, fieldnames = self.load_existing_data()
         
-        # Convert results to DataFrame
-        new_df = pd.DataFrame(results)
+        # Keep only new articles whose title and timestamp are not already saved
+        # (the saved rows were deduplicated when they were written)
+        seen = {(row['title'], row['timestamp']) for row in existing_rows}
+        new_rows = []
+        for row in results:
+            key = (row['title'], row['timestamp'])
+            if key not in seen:
+                seen.add(key)
+                new_rows.append(row)
+        original_count = len(existing_rows) + len(results)
+        final_count = len(existing_rows) + len(new_rows)
         
-        # Combine and remove duplicates
-        if not existing_df.empty:
-            combined_df = pd.concat([existing_df, new_df], ignore_index=True)
-        else:
-            combined_df = new_df
+        # Sort by timestamp (newest first, missing timestamps last)
+        rows = sorted(existing_rows + new_rows, key=lambda row: row['timestamp'] or '', reverse=True)
         
-        # Remove duplicates based on title and timestamp
-        original_count = len(combined_df)
-        combined_df.drop_duplicates(subset=["title", "timestamp"], inplace=True)
-        final_count = len(combined_df)
-        
-        # Sort by timestamp (newest first)
-        if 'timestamp' in combined_df.columns:
-            combined_df.sort_values('timestamp', ascending=False, inplace=True)
-        
-        # Save to CSV
-        combined_df.to_csv(self.config['csv_path'], index=False)
-        logging.info(f"Saved {final_count} unique articles to {self.config['csv_path']}")
+        # Save to CSV: append only the new rows when the file already has every column,
+        # otherwise (first run or older schema) write the whole sorted file
+        missing_columns = [key for key in results[0] if key not in fieldnames]
+        if fieldnames and not missing_columns:
+            if new_rows:
+                with open(self._csv_path, 'a', newline='', encoding='utf-8') as f:
+                    writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction='ignore', lineterminator='\n')
+                    writer.writerows(new_rows)
+        else:
+            with open(self._csv_path, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.DictWriter(f, fieldnames=fieldnames + missing_columns, extrasaction='ignore', lineterminator='\n')
+                writer.writeheader()
+                writer.writerows(rows)
+        logging.info(f"Saved {final_count} unique articles to {self._csv_path}")
         
         # Save to JSON
         json_data = {
@@ -241,44 +384,76 @@ class AINewsScraper:
                 "last_updated": datetime.now().isoformat(),
                 "source": self.config['base_url']
             },
-            "articles": combined_df.to_dict('records')
+            "articles": rows
         }
         
-        with open(self.config['json_path'], 'w', encoding='utf-8') as f:
-            json.dump(json_data, f, indent=2, ensure_ascii=False)
-        logging.info(f"Saved data to {self.config['json_path']}")
+        # orjson writes UTF-8 bytes directly (non-ASCII text is not escaped)
+        with open(self._json_path, 'wb') as f:
+            f.write(orjson.dumps(json_data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        logging.info(f"Saved data to {self._json_path}")
         
-        return combined_df
+        return rows
     
     def load_existing_data(self):
-        """Load existing CSV data"""
-        if os.path.exists(self.config['csv_path']):
+        """Load existing CSV data as a list of row dicts plus the CSV header"""
+        if os.path.exists(self._csv_path):
             try:
-                df = pd.read_csv(self.config['csv_path'])
+                with open(self._csv_path, newline='', encoding='utf-8') as f:
+                    reader = csv.DictReader(f)
+                    rows = list(reader)
+                    fieldnames = list(reader.fieldnames or [])
+                
                 # Ensure all required columns exist
                 required_columns = ["title", "short_desc", "image_url", "timestamp", "source", "published", "anchor_link", "long_desc"]
-                for col in required_columns:
-                    if col not in df.columns:
-                        df[col] = None
-                return df
+                columns = fieldnames + [col for col in required_columns if col not in fieldnames]
+                
+                for row in rows:
+                    # Empty CSV cells are missing values
+                    for col in columns:
+                        if not row.get(col):
+                            row[col] = None
+                    # Restore the types written by the scraper
+                    if row.get('word_count') is not None:
+                        row['word_count'] = int(float(row['word_count']))
+                    if row.get('published') is not None:
+                        row['published'] = row['published'] == 'True'
+                return rows, fieldnames
             except Exception as e:
                 logging.error(f"Error loading existing data: {e}")
         
-        return pd.DataFrame()
+        return [], []
     
-    def generate_summary(self, df):
+    def generate_summary(self, rows):
         """Generate a summary of scraped data"""
-        if df.empty:
+        if not rows:
             return
         
+        # Aggregate everything in a single pass over the rows
+        with_content = 0
+        earliest = latest = None
+        word_count_sum = word_count_rows = 0
+        for row in rows:
+            if row.get('long_desc'):
+                with_content += 1
+            timestamp = row.get('timestamp')
+            if timestamp:
+                if earliest is None or timestamp < earliest:
+                    earliest = timestamp
+                if latest is None or timestamp > latest:
+                    latest = timestamp
+            word_count = row.get('word_count')
+            if word_count is not None:
+                word_count_sum += word_count
+                word_count_rows += 1
+        
         summary = {
-            "total_articles": len(df),
-            "articles_with_content": len(df[df['long_desc'].notna()]),
+            "total_articles": len(rows),
+            "articles_with_content": with_content,
             "date_range": {
-                "earliest": df['timestamp'].min() if 'timestamp' in df.columns else None,
-                "latest": df['timestamp'].max() if 'timestamp' in df.columns else None
+                "earliest": earliest,
+                "latest": latest
             },
-            "avg_word_count": df['word_count'].mean() if 'word_count' in df.columns else 0
+            "avg_word_count": word_count_sum / word_count_rows if word_count_rows else 0
         }
         
         logging.info("=== SCRAPING SUMMARY ===")
@@ -289,7 +464,7 @@ class AINewsScraper:
         
         return summary
 
-def main():
+async def main():
     parser = argparse.ArgumentParser(description='Enhanced AI News Scraper')
     parser.add_argument('--config', default='config.json', help='Configuration file path')
     parser.add_argument('--no-content', action='store_true', help='Skip fetching full article content')
@@ -304,21 +479,24 @@ def main():
     
     try:
         # Scrape news
-        results = scraper.scrape_news()
+        results = await scraper.scrape_news()
         
         # Save data
-        df = scraper.save_data(results)
+        rows = scraper.save_data(results)
         
         # Generate summary
-        if df is not None:
-            scraper.generate_summary(df)
+        if rows:
+            scraper.generate_summary(rows)
         
-    except KeyboardInterrupt:
-        logging.info("Scraping interrupted by user")
     except Exception as e:
         logging.error(f"Unexpected error: {e}")
+    finally:
+        await scraper.session.aclose()
 
 if __name__ == "__main__":
-    main()
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        logging.info("Scraping interrupted by user")
 
 # This script is for single-site scraping only. For multi-site scraping, use the multisite_version project.